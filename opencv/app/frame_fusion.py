@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+# =========================================================
+# 다중 프레임 영양성분 융합 (카메라 프리뷰 프레임 연속 업로드용)
+#   - 영양성분별 함량/기준치 후보를 신뢰도 합으로 투표 (필드 단위)
+#   - 확정(또는 N프레임 연속 부재)된 필드는 이후 프레임에서 투표 생략,
+#     두 필드가 모두 정리된 성분만 파서 단계에서 건너뜀
+#   - 값 후보가 하나도 없는 이름만의 행은 등록하지 않음 (단일 문자 동의어 오탐 방지)
+#   - 등록된 모든 성분이 정리되면 complete=True
+# =========================================================
+FIELDS = ("함량", "기준치")
+
+# 후보 확정 조건: 서로 다른 프레임 ACCEPT_MIN_VOTES회 이상 일치,
+# 신뢰도 합 ≥ ACCEPT_SCORE, 2위 후보의 ACCEPT_MARGIN배 이상
+ACCEPT_MIN_VOTES = 2
+ACCEPT_SCORE = 1.0
+ACCEPT_MARGIN = 2.0
+
+# 성분 등록 후 필드 후보 없이 이만큼의 프레임이 지나면 '표기 없음'으로 정리
+ABSENT_FRAMES = 3
+
+SESSION_TTL_S = float(os.environ.get("OCR_SESSION_TTL_S", "120"))
+MAX_SESSIONS = int(os.environ.get("OCR_MAX_SESSIONS", "256"))
+
+class _FieldVote:
+    __slots__ = ("scores", "votes", "absent")
+
+    def __init__(self):
+        self.scores: Dict[str, float] = {}
+        self.votes: Dict[str, int] = {}
+        self.absent = 0     # 후보 없이 연속으로 부재한 프레임 수
+
+    def add(self, value: Optional[str], conf: Optional[float]):
+        """한 프레임의 관측 반영 (value=None: 이번 프레임에 후보 없음)"""
+        if value is None:
+            if not self.scores:
+                self.absent += 1
+            return
+        self.absent = 0
+        self.scores[value] = self.scores.get(value, 0.0) + (conf or 0.0)
+        self.votes[value] = self.votes.get(value, 0) + 1
+
+    def best(self) -> Optional[str]:
+        if not self.scores:
+            return None
+        return max(self.scores, key=self.scores.get)
+
+    def confident(self) -> bool:
+        if not self.scores:
+            return False
+        top_value = self.best()
+        top = self.scores[top_value]
+        second = max((v for k, v in self.scores.items() if k != top_value), default=0.0)
+        return (
+            self.votes[top_value] >= ACCEPT_MIN_VOTES
+            and top >= ACCEPT_SCORE
+            and top >= ACCEPT_MARGIN * second
+        )
+
+    def settled(self) -> bool:
+        """확정되었거나, 후보 없이 ABSENT_FRAMES 동안 부재 → 더 볼 필요 없음"""
+        return self.confident() or (not self.scores and self.absent >= ABSENT_FRAMES)
+
+class FrameSession:
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.frames = 0
+        self.touched = time.monotonic()
+        self._votes: Dict[str, Dict[str, _FieldVote]] = {}   # 영양성분 → 필드 → 투표
+        self._lock = threading.Lock()
+
+    def _row_settled(self, name: str) -> bool:
+        return all(v.settled() for v in self._votes[name].values())
+
+    def settled_names(self) -> frozenset:
+        """두 필드가 모두 정리되어 이후 프레임에서 건너뛸 영양성분"""
+        with self._lock:
+            return frozenset(n for n in self._votes if self._row_settled(n))
+
+    def add_frame(self, rows: List[Dict[str, Optional[str]]], confs: List[Dict[str, Optional[float]]]):
+        """
+        한 프레임의 파싱 결과 반영.
+        rows/confs: parse_nutrition_easyocr_results() 반환 형식
+        """
+        with self._lock:
+            self.frames += 1
+            self.touched = time.monotonic()
+            seen = set()
+            for row, conf in zip(rows, confs):
+                name = row["영양성분"]
+                if name in seen:    # 같은 프레임 중복 행은 1표만
+                    continue
+                votes = self._votes.get(name)
+                if votes is None:
+                    if all(row.get(f) is None for f in FIELDS):
+                        continue
+                    votes = self._votes[name] = {f: _FieldVote() for f in FIELDS}
+                seen.add(name)
+                for f in FIELDS:
+                    if not votes[f].settled():
+                        votes[f].add(row.get(f), conf.get(f))
+            # 이번 프레임에 안 보인 성분도 부재 프레임으로 계산 (화면 밖으로 나간 성분이 영원히 pending 되지 않게)
+            for name, votes in self._votes.items():
+                if name not in seen:
+                    for v in votes.values():
+                        if not v.settled():
+                            v.add(None, None)
+
+    def result(self) -> dict:
+        with self._lock:
+            rows = []
+            pending = []
+            for name, votes in self._votes.items():
+                rows.append({"영양성분": name, "함량": votes["함량"].best(), "기준치": votes["기준치"].best()})
+                if not self._row_settled(name):
+                    pending.append(name)
+            return {
+                "session_id": self.session_id,
+                "frames": self.frames,
+                "complete": bool(rows) and not pending,
+                "pending": pending,
+                "rows": rows,
+            }
+
+# -----------------------------
+# 세션 저장소 (프로세스 메모리, TTL 만료)
+# -----------------------------
+_SESSIONS: Dict[str, FrameSession] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+def _expire_locked(now: float):
+    for sid in [sid for sid, s in _SESSIONS.items() if now - s.touched > SESSION_TTL_S]:
+        del _SESSIONS[sid]
+    # 상한 초과 시 가장 오래 방치된 세션부터 제거
+    while len(_SESSIONS) >= MAX_SESSIONS:
+        oldest = min(_SESSIONS, key=lambda sid: _SESSIONS[sid].touched)
+        del _SESSIONS[oldest]
+
+def create_session() -> FrameSession:
+    now = time.monotonic()
+    with _SESSIONS_LOCK:
+        _expire_locked(now)
+        sess = FrameSession(uuid.uuid4().hex)
+        _SESSIONS[sess.session_id] = sess
+        return sess
+
+def get_session(session_id: str) -> Optional[FrameSession]:
+    """
+    기존 세션 조회. 없거나 만료되었으면 None (호출 측에서 404로 알려 클라이언트가 새로 시작)
+    """
+    now = time.monotonic()
+    with _SESSIONS_LOCK:
+        sess = _SESSIONS.get(session_id)
+        if sess is None:
+            return None
+        if now - sess.touched > SESSION_TTL_S:
+            del _SESSIONS[session_id]
+            return None
+        sess.touched = now
+        return sess
+
+def drop_session(session_id: str) -> bool:
+    with _SESSIONS_LOCK:
+        return _SESSIONS.pop(session_id, None) is not None
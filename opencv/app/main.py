@@ -3,13 +3,28 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from PIL import Image
 import io
+from contextlib import asynccontextmanager
+from typing import Optional
 
-from ocr_utils import run_ocr_tesseract, run_ocr_easyocr_text_only
-from parse_utils import parse_nutrition_lines, parse_nutrition_easyocr
-from text_norm import nutrition_normalize
+from ocr_utils import (
+    run_ocr_tesseract, run_ocr_tesseract_lines, run_ocr_easyocr_text_only, run_ocr_easyocr_with_boxes,
+    resolve_engine, preload_engines, easyocr_reader_stats, EASYOCR_ENABLED,
+)
+from parse_utils import (
+    parse_nutrition_easyocr, parse_nutrition_easyocr_results,
+    parse_nutrition_tesseract, parse_nutrition_tesseract_lines,
+)
+from frame_fusion import create_session, get_session, drop_session
+from nutrients_dict import NUTRIENT_SYNONYMS
 from preprocess import postprocess_text
 
-app = FastAPI(title="Medi_Talk OCR API")
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # OCR_PRELOAD 지정 시에만 엔진 선로딩 (기본은 첫 요청 시 지연 로딩)
+    preload_engines()
+    yield
+
+app = FastAPI(title="Medi_Talk OCR API", lifespan=lifespan)
 
 # CORS 설정 (외부 앱에서 API 호출 허용)
 app.add_middleware(
@@ -29,12 +44,12 @@ def _read_pil_from_upload(data: bytes) -> Image.Image:
     """업로드 바이너리를 PIL 이미지(RGB)로 변환"""
     return Image.open(io.BytesIO(data)).convert("RGB")
 
-def _ocr_raw_text(pil: Image.Image, *, lang: str, engine: str) -> tuple[str, str]:
+def _ocr_raw_text(pil: Image.Image, *, lang: str, engine: Optional[str]) -> tuple[str, str]:
     """
     OCR 엔진 공통 래퍼
     반환: (engine_used, raw_text)
     """
-    e = (engine or "easyocr").lower()
+    e = resolve_engine(engine)
     if e == "tesseract":
         return "tesseract", run_ocr_tesseract(pil, lang=lang)
     # default: easyocr
@@ -45,7 +60,10 @@ def _ocr_raw_text(pil: Image.Image, *, lang: str, engine: str) -> tuple[str, str
 # -----------------------------
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    out = {"status": "ok", "easyocr": EASYOCR_ENABLED}
+    if EASYOCR_ENABLED:
+        out["easyocr_readers"] = easyocr_reader_stats()
+    return out
 
 # -----------------------------
 # 일반 OCR (텍스트만)
@@ -54,7 +72,7 @@ def health():
 async def ocr_image(
     file: UploadFile = File(...),
     lang: str = "kor+eng",
-    engine: str = "easyocr",
+    engine: Optional[str] = None,
 ):
     try:
         data = await file.read()
@@ -75,20 +93,17 @@ async def ocr_image(
 async def ocr_nutrition(
     file: UploadFile = File(...),
     lang: str = "kor+eng",
-    engine: str = "easyocr",
+    engine: Optional[str] = None,
 ):
     try:
         data = await file.read()
         pil = _read_pil_from_upload(data)
 
-        e = (engine or "easyocr").lower()
+        e = resolve_engine(engine)
         if e == "tesseract":
-            # 1) 텍스트 추출
-            engine_used, raw_text = _ocr_raw_text(pil, lang=lang, engine="tesseract")
-            # 2) 구조화 파싱 (라인 기반) — 내부에서 nutrition 정규화 수행
-            rows = parse_nutrition_lines(raw_text)
-            # 3) 응답용 텍스트(정규화본) — 엔진에 상관없이 동일 규칙으로 제공
-            text = nutrition_normalize(raw_text)
+            # TSV 단어 좌표로 행 재구성 → 블록 단위 정규화·파싱 (텍스트는 정규화본)
+            text, rows = parse_nutrition_tesseract(pil, lang=lang)
+            engine_used = "tesseract"
         else:
             # easyocr: 박스 기반 파서가 텍스트/rows 동시 반환
             raw_text, rows = parse_nutrition_easyocr(pil, lang=lang)  # raw_text는 이미 정규화본(text_pp)
@@ -103,3 +118,53 @@ async def ocr_nutrition(
         })
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+# -----------------------------
+# 영양성분 OCR (다중 프레임 세션)
+# -----------------------------
+@app.post("/ocr/nutrition/frame")
+async def ocr_nutrition_frame(
+    file: UploadFile = File(...),
+    session_id: Optional[str] = None,
+    lang: str = "kor+eng",
+    engine: Optional[str] = None,
+):
+    """
+    카메라 프리뷰 프레임을 1장씩 받아 세션 단위로 영양성분 값을 융합.
+    첫 호출은 session_id 없이 → 응답의 session_id로 이후 프레임 전송.
+    complete=True가 되면 촬영 중단 가능 (pending: 아직 확정되지 않은 성분)
+    알 수 없거나 만료된 session_id → 404 (누적 결과가 없으므로 클라이언트가 새 세션으로 재시작)
+    """
+    if session_id:
+        sess = get_session(session_id)
+        if sess is None:
+            raise HTTPException(status_code=404, detail=f"unknown or expired session: {session_id}")
+    else:
+        sess = create_session()
+    try:
+        data = await file.read()
+        pil = _read_pil_from_upload(data)
+        # 두 필드가 모두 정리된 성분만 이번 프레임에서 값 추출 생략
+        skip = sess.settled_names()
+
+        e = resolve_engine(engine)
+        if e == "tesseract":
+            lines = run_ocr_tesseract_lines(pil, lang=lang)
+            _text, rows, confs = parse_nutrition_tesseract_lines(lines, skip_names=skip)
+            # 라인 파서는 미매칭 조각도 이름으로 남기므로 사전 성분만 투표
+            kept = [k for k, r in enumerate(rows) if r["영양성분"] in NUTRIENT_SYNONYMS]
+            rows, confs = [rows[k] for k in kept], [confs[k] for k in kept]
+        else:
+            results = run_ocr_easyocr_with_boxes(pil, lang)
+            _text, rows, confs = parse_nutrition_easyocr_results(results, skip_names=skip)
+
+        sess.add_frame(rows, confs)
+        out = sess.result()
+        out.update({"engine": e, "lang": lang})
+        return JSONResponse(out)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/ocr/nutrition/session/{session_id}")
+def ocr_nutrition_session_close(session_id: str):
+    return {"session_id": session_id, "closed": drop_session(session_id)}
@@ -1,13 +1,60 @@
 import os
+import math
+import importlib
 import cv2
 import numpy as np
 import pytesseract
-import torch
-import easyocr
 from PIL import Image
-from preprocess import preprocess_for_easyocr
+from preprocess import (
+    preprocess_for_easyocr, preprocess_for_easyocr_gray, upscale_into_scratch,
+    PREPROCESS_MODE, estimate_skew_deg,
+)
+from reader_cache import EasyOCRReaderManager
 
-_EASYOCR_READER_CACHE = {}
+# -----------------------------
+# 배포 설정 (환경변수)
+#   OCR_ENABLE_EASYOCR=0  → torch/easyocr를 전혀 import하지 않는 Tesseract 전용 모드
+#   OCR_PRELOAD=easyocr   → 기동 시점에 엔진을 미리 로드 (기본: 첫 요청 시 로드)
+# -----------------------------
+def _env_flag(name: str, default: bool) -> bool:
+    v = os.environ.get(name)
+    if v is None or not v.strip():
+        return default
+    return v.strip().lower() not in ("0", "false", "no", "off")
+
+EASYOCR_ENABLED = _env_flag("OCR_ENABLE_EASYOCR", True)
+DEFAULT_ENGINE = "easyocr" if EASYOCR_ENABLED else "tesseract"
+PRELOAD_ENGINES = [
+    e.strip().lower() for e in os.environ.get("OCR_PRELOAD", "").split(",") if e.strip()
+]
+
+# 언어셋별 Reader 관리 (검출기 공유 + 메모리 상한 LRU)
+_EASYOCR_READERS = EasyOCRReaderManager()
+
+# -----------------------------
+# 무거운 모듈 지연 import (torch/easyocr는 첫 사용 시점에만 로드)
+# -----------------------------
+_HEAVY_MODULES = {}
+
+def _lazy_import(name: str):
+    mod = _HEAVY_MODULES.get(name)
+    if mod is None:
+        mod = importlib.import_module(name)
+        _HEAVY_MODULES[name] = mod
+    return mod
+
+def resolve_engine(engine) -> str:
+    """
+    요청 엔진명을 실제 사용할 엔진으로 변환.
+    EasyOCR 비활성 배포에서는 easyocr 요청도 tesseract로 처리한다.
+    """
+    e = (engine or DEFAULT_ENGINE).lower()
+    if e == "tesseract" or not EASYOCR_ENABLED:
+        return "tesseract"
+    return "easyocr"
+
+def _use_gpu() -> bool:
+    return bool(_lazy_import("torch").cuda.is_available())
 
 def _map_langs_for_easyocr(lang: str):
     lang = (lang or "").lower()
@@ -19,46 +66,208 @@ def _map_langs_for_easyocr(lang: str):
         return ["ko"]
     return ["en"]
 
+def _acquire_easyocr_reader(lang: str):
+    """사용 중에는 LRU 제거되지 않는 Reader 컨텍스트 반환"""
+    if not EASYOCR_ENABLED:
+        raise RuntimeError("EasyOCR is disabled (OCR_ENABLE_EASYOCR=0)")
+    return _EASYOCR_READERS.acquire(_map_langs_for_easyocr(lang), _use_gpu())
+
 def _get_easyocr_reader(lang: str):
-    langs = _map_langs_for_easyocr(lang)
-    key = ",".join(langs) + ("|gpu" if torch.cuda.is_available() else "|cpu")
-    if key not in _EASYOCR_READER_CACHE:
-        _EASYOCR_READER_CACHE[key] = easyocr.Reader(langs, gpu=torch.cuda.is_available())
-    return _EASYOCR_READER_CACHE[key]
+    with _acquire_easyocr_reader(lang) as reader:
+        return reader
+
+def easyocr_reader_stats() -> dict:
+    """Reader 캐시 현황 (헬스체크/모니터링용)"""
+    return _EASYOCR_READERS.stats()
+
+def preload_engines(engines=None, lang: str = "kor+eng"):
+    """
+    지정 엔진을 미리 로드 (워커 기동 시 첫 요청 지연을 없애고 싶을 때).
+    engines 미지정 시 OCR_PRELOAD 환경변수 사용. 반환: 로드된 엔진 목록
+    """
+    loaded = []
+    for e in (PRELOAD_ENGINES if engines is None else engines):
+        if e == "easyocr" and EASYOCR_ENABLED:
+            _get_easyocr_reader(lang)
+            loaded.append(e)
+        elif e == "tesseract":
+            pytesseract.get_tesseract_version()
+            loaded.append(e)
+    return loaded
 
 # -----------------------------
 # 공통: EasyOCR 입력 준비 + 호출 래퍼
 # -----------------------------
-def _prepare_img_for_easyocr(pil: Image.Image) -> np.ndarray:
+def _prepare_img_for_easyocr(pil: Image.Image, mode: str = None) -> np.ndarray:
     """
     EasyOCR 공통 사전처리:
       - 작은 해상도면 업스케일(1.5x)
       - EasyOCR 친화 전처리 파이프라인 적용
-    반환: 전처리된 RGB ndarray
+    mode: "rgb" | "gray" (기본: OCR_PREPROCESS 환경변수)
+    반환: 전처리된 RGB ndarray (gray 모드면 GRAY ndarray — readtext가 그대로 수용)
     """
-    img = np.array(pil)
+    mode = mode or PREPROCESS_MODE
+    if mode == "gray":
+        # 업스케일 전에 1채널로 줄여 리사이즈 비용도 1/3로
+        img = np.asarray(pil.convert("L"))
+    else:
+        img = np.array(pil)
     h, w = img.shape[:2]
+    if mode == "gray":
+        if max(h, w) < 1600:
+            img = upscale_into_scratch(img, 1.5)
+        return preprocess_for_easyocr_gray(img)
     if max(h, w) < 1600:
         img = cv2.resize(img, None, fx=1.5, fy=1.5, interpolation=cv2.INTER_CUBIC)
-    img = preprocess_for_easyocr(img)
-    return img
+    return preprocess_for_easyocr(img)
 
 def _easyocr_read(img_rgb: np.ndarray, lang: str, *, detail: int, paragraph: bool):
     """
     EasyOCR 호출 공통 래퍼.
     detail=0 → 텍스트만, detail=1 → (bbox, text, conf)
     """
-    reader = _get_easyocr_reader(lang)
-    return reader.readtext(img_rgb, detail=detail, paragraph=paragraph)
+    with _acquire_easyocr_reader(lang) as reader:
+        return reader.readtext(img_rgb, detail=detail, paragraph=paragraph)
 
 # -----------------------------
 # OCR 엔진별 엔트리
 # -----------------------------
+_TESSERACT_CONFIG = "--oem 3 --psm 6 -c preserve_interword_spaces=1 -c user_defined_dpi=300"
+
 def run_ocr_tesseract(pil: Image.Image, lang: str) -> str:
     os.environ.setdefault("TESSDATA_PREFIX", "/usr/share/tesseract-ocr/5/tessdata")
     img_bgr = cv2.cvtColor(np.array(pil), cv2.COLOR_RGB2BGR)
-    config = "--oem 3 --psm 6 -c preserve_interword_spaces=1 -c user_defined_dpi=300"
-    return pytesseract.image_to_string(img_bgr, lang=lang, config=config)
+    return pytesseract.image_to_string(img_bgr, lang=lang, config=_TESSERACT_CONFIG)
+
+# 단어 튜플: (left, top, width, height, text, conf)
+def _median(vals):
+    vals = sorted(vals)
+    return vals[len(vals) // 2]
+
+def _fit_baseline(words, slope=None):
+    """
+    단어 하단점 (x중심, bottom)에 직선 적합 → (slope, intercept).
+    slope를 주면 절편만 적합 (단어가 적은 짧은 라인용)
+    """
+    xs = [w[0] + w[2] / 2 for w in words]
+    ys = [w[1] + w[3] for w in words]
+    n = len(words)
+    mx, my = sum(xs) / n, sum(ys) / n
+    if slope is None:
+        sxx = sum((x - mx) ** 2 for x in xs)
+        slope = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx if sxx > 0 else 0.0
+    return slope, my - slope * mx
+
+class _TessLine:
+    __slots__ = ("words", "slope", "icpt", "height", "x0", "x1", "cx")
+
+    def __init__(self, words, slope, icpt):
+        self.words = words
+        self.slope, self.icpt = slope, icpt
+        self.height = _median(w[3] for w in words)
+        self.x0 = min(w[0] for w in words)
+        self.x1 = max(w[0] + w[2] for w in words)
+        self.cx = (self.x0 + self.x1) / 2
+
+    def residual(self, w) -> float:
+        """단어 하단이 이 라인 기준선(외삽)에서 벗어난 정도 (높이 대비)"""
+        xc = w[0] + w[2] / 2
+        return abs(w[1] + w[3] - (self.slope * xc + self.icpt)) / max(self.height, w[3])
+
+def _rows_from_lines(lines, skew_fn=None):
+    """
+    Tesseract 라인(page/block/par/line 키로 묶인 단어 목록)들을 (라인 텍스트, 평균 신뢰도 0~1) 행으로.
+      - 라인 분할은 Tesseract 결과를 그대로 신뢰 (기울기에 강함)
+      - 표 형태 라벨의 좌우 칸이 별도 라인으로 나온 경우에만,
+        x 범위가 겹치지 않고 모든 단어가 이웃 라인의 기준선(기울기 반영) 위에 있을 때 병합
+    skew_fn: 긴 라인이 없어 기울기를 직접 적합할 수 없을 때만 호출되는 페이지 기울기(tan) 추정 함수
+    각 라인은 기울기 보정 세로 위치 순으로 처리하고, 위치가 한 줄 높이 이내인 최근 행들과만 비교 (선형 시간)
+    """
+    if not lines:
+        return
+    h_med = _median(w[3] for ln in lines for w in ln)
+
+    def _long(ln):
+        return len(ln) >= 2 and max(w[0] + w[2] for w in ln) - min(w[0] for w in ln) >= 3 * h_med
+
+    # 페이지 기울기: 충분히 긴 라인들의 적합 기울기 중앙값 (없으면 이미지 추정값)
+    slopes = [_fit_baseline(ln)[0] for ln in lines if _long(ln)]
+    if slopes:
+        skew = _median(slopes)
+    else:
+        skew = skew_fn() if skew_fn is not None else 0.0
+
+    tls = []
+    for ln in lines:
+        slope, icpt = _fit_baseline(ln, None if _long(ln) else skew)
+        tls.append(_TessLine(ln, slope, icpt))
+    # 기울기 보정된 세로 위치 순으로 처리
+    def _key(t):
+        return t.icpt + (t.slope - skew) * t.cx
+    tls.sort(key=_key)
+
+    rows = []       # 각 행: 병합된 _TessLine 목록 (생성 순 = 세로 위치 순)
+    row_keys = []   # 각 행 첫 라인의 세로 위치
+    lo = 0          # 비교 창의 시작: 이보다 앞 행은 한 줄 높이 이상 위라 병합 불가
+    for tl in tls:
+        key = _key(tl)
+        while lo < len(rows) and row_keys[lo] < key - h_med:
+            lo += 1
+        best, best_res = None, 0.5
+        for row in rows[lo:]:
+            if any(tl.x0 < m.x1 and m.x0 < tl.x1 for m in row):
+                continue
+            # 가로로 가장 가까운 라인의 기준선과 비교 (외삽 거리 최소화)
+            anchor = min(row, key=lambda m: abs(m.cx - tl.cx))
+            res = max(anchor.residual(w) for w in tl.words)
+            if res <= best_res:
+                best, best_res = row, res
+        if best is None:
+            rows.append([tl])
+            row_keys.append(key)
+        else:
+            best.append(tl)
+
+    for row in rows:
+        words = sorted((w for m in row for w in m.words), key=lambda w: w[0])
+        text = " ".join(w[4] for w in words)
+        conf = sum(w[5] for w in words) / len(words) / 100.0
+        yield text, conf
+
+def run_ocr_tesseract_lines(pil: Image.Image, lang: str):
+    """
+    Tesseract image_to_data(TSV) 1회 호출 → Tesseract 라인 단위로 묶고 표 칸만 기준선 기준 병합.
+    반환: 페이지 순서대로 (라인 텍스트, 신뢰도 0~1)를 내보내는 제너레이터
+    """
+    os.environ.setdefault("TESSDATA_PREFIX", "/usr/share/tesseract-ocr/5/tessdata")
+    img_rgb = np.array(pil)
+    img_bgr = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR)
+    data = pytesseract.image_to_data(
+        img_bgr, lang=lang, config=_TESSERACT_CONFIG, output_type=pytesseract.Output.DICT
+    )
+    # 이미지 기울기 추정(Canny+Hough)은 긴 라인이 없는 페이지에서만 1회 계산
+    skew_cache = []
+
+    def skew_fn():
+        if not skew_cache:
+            gray = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY)
+            skew_cache.append(math.tan(math.radians(estimate_skew_deg(gray))))
+        return skew_cache[0]
+
+    page, lines = None, {}
+    for i, text in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        text = (text or "").strip()
+        if conf < 0 or not text:
+            continue
+        if data["page_num"][i] != page:
+            yield from _rows_from_lines(list(lines.values()), skew_fn)
+            page, lines = data["page_num"][i], {}
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(
+            (data["left"][i], data["top"][i], data["width"][i], data["height"][i], text, conf)
+        )
+    yield from _rows_from_lines(list(lines.values()), skew_fn)
 
 def run_ocr_easyocr_text_only(pil: Image.Image, lang: str) -> str:
     """
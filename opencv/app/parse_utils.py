@@ -1,13 +1,15 @@
 # app/parse_utils.py
 import re
+import bisect
 import difflib
-from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple, Iterable, Iterator
 
-from ocr_utils import run_ocr_easyocr_with_boxes
+from ocr_utils import run_ocr_easyocr_with_boxes, run_ocr_tesseract_lines
 from nutrients_dict import NUTRIENT_SYNONYMS
 from units_dict import UNIT_REGEX, normalize_unit, is_unit
 from constants import NUM_PATTERN, PERCENT_PATTERN
-from text_norm import nutrition_normalize
+from text_norm import nutrition_normalize, is_blank_after_clean
 
 # -----------------------------
 # 공통 유틸
@@ -34,13 +36,20 @@ def _is_pure_unit_or_percent(s: str) -> bool:
         return True
     return False
 
+# 동의어 패턴 사전 컴파일 (사전 순서 = 매칭 우선순위 유지)
+_SYNONYM_PATTERNS = [
+    (canon, re.compile(rf"\b{s}\b", re.IGNORECASE))
+    for canon, syns in NUTRIENT_SYNONYMS.items() for s in syns
+]
+_ALL_SYNONYMS = [syn for syns in NUTRIENT_SYNONYMS.values() for syn in syns]
+
 def match_canonical_name(fragment: str) -> Optional[str]:
-    for canon, syns in NUTRIENT_SYNONYMS.items():
-        for s in syns:
-            if re.search(rf"\b{s}\b", fragment, re.IGNORECASE):
-                return canon
+    for canon, pat in _SYNONYM_PATTERNS:
+        if pat.search(fragment):
+            return canon
     return None
 
+@lru_cache(maxsize=4096)
 def fuzzy_match_name(fragment: str) -> Optional[str]:
     frag = _cleanup_name_fragment(fragment)
     if not frag or _is_pure_unit_or_percent(frag):
@@ -50,8 +59,7 @@ def fuzzy_match_name(fragment: str) -> Optional[str]:
     if canon:
         return canon
 
-    all_synonyms = [syn for syns in NUTRIENT_SYNONYMS.values() for syn in syns]
-    close = difflib.get_close_matches(frag, all_synonyms, n=1, cutoff=0.72)
+    close = difflib.get_close_matches(frag, _ALL_SYNONYMS, n=1, cutoff=0.72)
     if close:
         return match_canonical_name(close[0])
     return None
@@ -69,7 +77,8 @@ def _looks_like_kcal(s: str) -> bool:
 def _fix_digits_like_zero(s: str) -> str:
     return re.sub(r"[gGoO]", "0", s)
 
-def _find_amount_in_segment(toks: List[str], start: int, end: int) -> Optional[str]:
+def _find_amount_in_segment(toks: List[str], start: int, end: int) -> Tuple[Optional[str], int]:
+    """반환: (함량 문자열, 근거 토큰 인덱스) — 없으면 (None, -1)"""
     i = start
     while i < end:
         t = toks[i]
@@ -77,99 +86,190 @@ def _find_amount_in_segment(toks: List[str], start: int, end: int) -> Optional[s
         # 0g / 0mg 오인식
         m_zero_g = re.fullmatch(r"(?i)\s*o\s*(mg|g)\s*", t)
         if m_zero_g:
-            return f"0 {normalize_unit(m_zero_g.group(1))}"
+            return f"0 {normalize_unit(m_zero_g.group(1))}", i
 
         # kcal이 붙어서 나온 경우 (예: 3g0kca1)
         m_kcal_one = re.fullmatch(r"(?i)\s*([0-9oOgG]+)\s*kca[l1i]\s*", t)
         if m_kcal_one:
             val = _fix_digits_like_zero(m_kcal_one.group(1))
-            return f"{val} kcal"
+            return f"{val} kcal", i
 
         # 일반 NUM+UNIT
         av, au = _split_amount_unit(t)
         if av and au:
-            return f"{av} {au}"
+            return f"{av} {au}", i
 
         # 분리형: NUM, UNIT  또는 NUM + kcal류
         if re.fullmatch(rf"{NUM_PATTERN}", t):
             if i + 1 < end and is_unit(toks[i + 1]):
-                return f"{t} {normalize_unit(toks[i + 1])}"
+                return f"{t} {normalize_unit(toks[i + 1])}", i
             if i + 1 < end and _looks_like_kcal(toks[i + 1]):
-                return f"{t} kcal"
+                return f"{t} kcal", i
             if i + 1 < end and _looks_like_kcal(toks[i + 1]) and re.search(r"[gGoO]", t):
-                return f"{_fix_digits_like_zero(t)} kcal"
+                return f"{_fix_digits_like_zero(t)} kcal", i
         i += 1
-    return None
+    return None, -1
 
-def _find_percent_in_segment(toks: List[str], start: int, end: int) -> Optional[str]:
+def _find_percent_in_segment(toks: List[str], start: int, end: int) -> Tuple[Optional[str], int]:
+    """반환: (기준치 문자열, 근거 토큰 인덱스) — 없으면 (None, -1)"""
     i = start
     while i < end:
         t = toks[i]
         if re.fullmatch(rf"{NUM_PATTERN}%", t):
-            return t
+            return t, i
         i += 1
-    return None
+    return None, -1
 
 # -----------------------------
-# 라인 기반 파서 (Tesseract 경로용) — main.py에서 필요로 하므로 유지
-# 정확도 개선 X: 최소 기능 (이름/함량/기준치 1라인 스캔)
+# 라인 기반 파서 (Tesseract 경로용)
+# 줄 단위 반복 대신, 사전 컴파일 패턴을 블록(여러 줄) 전체에 한 번씩 적용.
+# 공백은 [ \t]만 허용해 매치가 줄 경계를 넘지 않게 한다.
 # -----------------------------
-def parse_nutrition_lines(text: str) -> List[Dict[str, Optional[str]]]:
-    text = nutrition_normalize(text)
-    rows: List[Dict[str, Optional[str]]] = []
-
-    for raw in text.splitlines():
-        line = raw.strip()
-        if not line:
-            continue
-
-        # 기준치
-        percent_str = None
-        pm = re.search(PERCENT_PATTERN, line, flags=re.I)
-        if pm:
-            percent_str = f"{pm.group(1)}%"
-            line = re.sub(PERCENT_PATTERN, " ", line, flags=re.I)
-
-        # 함량 (NUM+UNIT)
-        amount_str = None
-        m = re.search(rf"\b({NUM_PATTERN})\s*({UNIT_REGEX})\b", line, flags=re.I)
-        if m:
-            val = m.group(1).replace(",", "")
-            unit = normalize_unit(m.group(2))
-            amount_str = f"{val} {unit}"
-            line = (line[:m.start()] + " " + line[m.end():]).strip()
-        # kcal 보조
-        if amount_str is None:
-            mk = re.search(r"(?i)\b([0-9oOgG]+)\s*kca[l1i]\b", line)
-            if mk:
-                amount_str = f"{_fix_digits_like_zero(mk.group(1))} kcal"
-
-        # 이름
-        name_frag = _cleanup_name_fragment(line)
+_HSP = r"[ \t]*"
+_RE_DOC_PERCENT = re.compile(rf"({NUM_PATTERN}){_HSP}(%|％|96)\b", re.I)
+_RE_DOC_AMOUNT = re.compile(rf"\b({NUM_PATTERN}){_HSP}({UNIT_REGEX})\b", re.I)
+_RE_DOC_KCAL = re.compile(r"(?i)\b([0-9oOgG]+)[ \t]*kca[l1i]\b")
+_RE_DOC_NUM = re.compile(rf"\b{NUM_PATTERN}\b")
+_RE_HSPACE = re.compile(r"[ \t]+")
+_RE_NEWLINE = re.compile(r"\n")
+
+# 한 번에 정규화/파싱할 최대 줄 수 (긴 텍스트도 메모리 상한 유지)
+PARSE_BLOCK_LINES = 512
+
+# 라인 신뢰도를 알 수 없을 때 사용하는 기본값
+TESSERACT_DEFAULT_CONF = 0.5
+
+def _blank(m: "re.Match") -> str:
+    # 같은 길이의 공백으로 치환 → 이후 매치 위치(오프셋)가 그대로 유지됨
+    return " " * (m.end() - m.start())
+
+def _line_index(starts: List[int], pos: int) -> int:
+    return bisect.bisect_right(starts, pos) - 1
+
+def _parse_normalized_block(text: str) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+    """
+    정규화된 블록 텍스트 → (줄 번호, row) 순회.
+    줄마다: 첫 기준치(%) / 첫 함량(NUM+UNIT, 없으면 kcal 보조) / 나머지를 이름으로.
+    """
+    starts = [0] + [m.end() for m in _RE_NEWLINE.finditer(text)]
+    n_lines = len(starts)
+    percents: List[Optional[str]] = [None] * n_lines
+    amounts: List[Optional[str]] = [None] * n_lines
+
+    # 기준치: 줄별 첫 매치 기록 후 전부 지움
+    for m in _RE_DOC_PERCENT.finditer(text):
+        ln = _line_index(starts, m.start())
+        if percents[ln] is None:
+            percents[ln] = f"{m.group(1)}%"
+    text = _RE_DOC_PERCENT.sub(_blank, text)
+
+    # 함량: 줄별 첫 매치만 기록하고 그 매치만 지움
+    spans = []
+    for m in _RE_DOC_AMOUNT.finditer(text):
+        ln = _line_index(starts, m.start())
+        if amounts[ln] is None:
+            amounts[ln] = f"{m.group(1).replace(',', '')} {normalize_unit(m.group(2))}"
+            spans.append((m.start(), m.end()))
+    if spans:
+        parts, prev = [], 0
+        for a, b in spans:
+            parts.append(text[prev:a])
+            parts.append(" " * (b - a))
+            prev = b
+        parts.append(text[prev:])
+        text = "".join(parts)
+
+    # kcal 보조 (함량이 없는 줄만)
+    for m in _RE_DOC_KCAL.finditer(text):
+        ln = _line_index(starts, m.start())
+        if amounts[ln] is None:
+            amounts[ln] = f"{_fix_digits_like_zero(m.group(1))} kcal"
+
+    # 이름 조각: _cleanup_name_fragment의 블록 버전 (기준치 → 수치+단위 → 수치 순 제거)
+    # 함량을 잘라낸 뒤 새로 붙어 생기는 기준치 패턴(예: '1.5 [100mg] 96')도 지워야 동일 결과
+    text = _RE_DOC_PERCENT.sub(_blank, text)
+    text = _RE_DOC_AMOUNT.sub(" ", text)
+    text = _RE_DOC_NUM.sub(" ", text)
+
+    for ln, line in enumerate(text.split("\n")):
+        name_frag = _RE_HSPACE.sub(" ", line).strip()
         if not name_frag:
             continue
         canon = fuzzy_match_name(name_frag) or name_frag
+        yield ln, {"영양성분": canon, "함량": amounts[ln], "기준치": percents[ln]}
 
-        rows.append({"영양성분": canon, "함량": amount_str, "기준치": percent_str})
-
-    return rows
+# -----------------------------
+# Tesseract(TSV 단어 좌표) 기반 파서
+# -----------------------------
+def parse_nutrition_tesseract_lines(lines: Iterable[Tuple[str, float]], *, skip_names=frozenset()):
+    """
+    좌표로 재구성한 (라인 텍스트, 라인 신뢰도) 목록을 구조화.
+    반환: (text_pp, rows, confs) — parse_nutrition_easyocr_results()와 같은 형식
+    정규화로 줄 수가 달라진 블록(줄 경계 병합)은 TESSERACT_DEFAULT_CONF 사용.
+    """
+    texts: List[str] = []
+    rows: List[Dict[str, Optional[str]]] = []
+    confs: List[Dict[str, Optional[float]]] = []
+
+    def _blocks():
+        block: List[Tuple[str, float]] = []
+        for item in lines:
+            # clean 단계에서 사라질 줄은 미리 제외 → 정규화 후에도 줄/신뢰도 정렬 유지
+            if is_blank_after_clean(item[0]):
+                continue
+            block.append(item)
+            if len(block) >= PARSE_BLOCK_LINES:
+                yield block
+                block = []
+        if block:
+            yield block
+
+    for block in _blocks():
+        norm = nutrition_normalize("\n".join(t for (t, _c) in block))
+        if not norm:
+            continue
+        texts.append(norm)
+        aligned = norm.count("\n") + 1 == len(block)
+        for ln, row in _parse_normalized_block(norm):
+            if row["영양성분"] in skip_names:
+                continue
+            c = block[ln][1] if aligned else TESSERACT_DEFAULT_CONF
+            rows.append(row)
+            confs.append({f: (c if row[f] is not None else None) for f in ("함량", "기준치")})
+
+    return "\n".join(texts), rows, confs
+
+def parse_nutrition_tesseract(pil, lang: str):
+    text_pp, rows, _confs = parse_nutrition_tesseract_lines(run_ocr_tesseract_lines(pil, lang))
+    return text_pp, rows
 
 # -----------------------------
 # EasyOCR(박스) 기반 파서 — 세그먼트 + Fallback
 # -----------------------------
-def parse_nutrition_easyocr(pil, lang: str):
-    results = run_ocr_easyocr_with_boxes(pil, lang)
-
+# 신뢰도 필터 미통과 토큰에서 Fallback으로 얻은 값의 신뢰도
+FALLBACK_CONF = 0.2
+
+def parse_nutrition_easyocr_results(results, *, skip_names=frozenset()):
+    """
+    EasyOCR detail=1 결과를 구조화.
+    반환: (text_pp, rows, confs)
+      - rows: [{"영양성분", "함량", "기준치"}, ...]
+      - confs: rows와 같은 순서의 {"함량": float|None, "기준치": float|None}
+        (이름 토큰과 값 토큰 신뢰도 중 작은 값)
+    skip_names에 있는 영양성분은 값 추출을 건너뛴다 (다중 프레임 융합에서 이미 확정된 항목).
+    """
     # 전체 토큰(신뢰도 무관) — 응답 텍스트/보조검색용
     tokens_all_raw: List[str] = [t.strip() for (_b, t, c) in results if t]
     tokens_all: List[str] = [nutrition_normalize(t) for t in tokens_all_raw]
 
     # 신뢰도 필터 통과 토큰 — 1차 탐색
-    tokens_raw: List[str] = [t.strip() for (_b, t, c) in results if t and c >= 0.30]
-    toks: List[str] = [nutrition_normalize(t) for t in tokens_raw]
+    kept = [(t.strip(), float(c)) for (_b, t, c) in results if t and c >= 0.30]
+    toks: List[str] = [nutrition_normalize(t) for (t, _c) in kept]
+    tok_confs: List[float] = [c for (_t, c) in kept]
 
     text_pp = " ".join(tokens_all)
     rows: List[Dict[str, Optional[str]]] = []
+    confs: List[Dict[str, Optional[float]]] = []
 
     i = 0
     N = len(toks)
@@ -200,9 +300,17 @@ def parse_nutrition_easyocr(pil, lang: str):
                 break
             k += 1
 
+        if name in skip_names:
+            i = next_name_idx
+            continue
+
+        name_conf = min(tok_confs[i:j])
+
         # 구간에서 값 추출 (1차: 신뢰도 필터 통과 토큰)
-        amount_str = _find_amount_in_segment(toks, j, next_name_idx)
-        percent_str = _find_percent_in_segment(toks, j, next_name_idx)
+        amount_str, a_idx = _find_amount_in_segment(toks, j, next_name_idx)
+        percent_str, p_idx = _find_percent_in_segment(toks, j, next_name_idx)
+        amount_conf = min(name_conf, tok_confs[a_idx]) if amount_str is not None else None
+        percent_conf = min(name_conf, tok_confs[p_idx]) if percent_str is not None else None
 
         # Fallback: 동일 구간을 전체 토큰으로 재검색
         if amount_str is None or percent_str is None:
@@ -217,12 +325,21 @@ def parse_nutrition_easyocr(pil, lang: str):
                         mk = re.search(r"(?i)\b([0-9oOgG]+)\s*kca[l1i]\b", seg_text)
                         if mk:
                             amount_str = f"{_fix_digits_like_zero(mk.group(1))} kcal"
+                    if amount_str is not None:
+                        amount_conf = FALLBACK_CONF
                 if percent_str is None:
                     p = re.search(rf"\b({NUM_PATTERN})\s*%\b", seg_text)
                     if p:
                         percent_str = f"{p.group(1)}%"
+                        percent_conf = FALLBACK_CONF
 
         rows.append({"영양성분": name, "함량": amount_str, "기준치": percent_str})
+        confs.append({"함량": amount_conf, "기준치": percent_conf})
         i = next_name_idx
 
+    return text_pp, rows, confs
+
+def parse_nutrition_easyocr(pil, lang: str):
+    results = run_ocr_easyocr_with_boxes(pil, lang)
+    text_pp, rows, _confs = parse_nutrition_easyocr_results(results)
     return text_pp, rows
@@ -1,7 +1,65 @@
+import os
+import threading
 import cv2
 import numpy as np
 from text_norm import pipeline  # 중앙 정규화 유틸 사용
 
+# 전처리 모드: "rgb"(기본, 3채널) | "gray"(휘도 1채널, 버퍼 재사용)
+PREPROCESS_MODE = os.environ.get("OCR_PREPROCESS", "rgb").strip().lower() or "rgb"
+
+# 워커 스레드별 CLAHE 객체/스크래치 버퍼 (호출마다 재생성·재할당 방지)
+_TLS = threading.local()
+
+def _clahe():
+    c = getattr(_TLS, "clahe", None)
+    if c is None:
+        c = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        _TLS.clahe = c
+    return c
+
+def _scratch(name: str, shape) -> np.ndarray:
+    """이름별 uint8 버퍼. 크기가 바뀔 때만 재할당"""
+    bufs = getattr(_TLS, "bufs", None)
+    if bufs is None:
+        bufs = _TLS.bufs = {}
+    buf = bufs.get(name)
+    if buf is None or buf.shape != tuple(shape):
+        buf = np.empty(shape, np.uint8)
+        bufs[name] = buf
+    return buf
+
+_DILATE_KERNEL = np.ones((3, 3), np.uint8)
+
+def upscale_into_scratch(img: np.ndarray, scale: float) -> np.ndarray:
+    """
+    cv2.resize 결과를 워커별 스크래치 버퍼에 기록 (gray 모드 업스케일용).
+    ※ 반환 배열은 다음 호출 전까지만 유효
+    """
+    h, w = img.shape[:2]
+    nw, nh = int(round(w * scale)), int(round(h * scale))
+    dst = _scratch("up", (nh, nw) + img.shape[2:])
+    return cv2.resize(img, (nw, nh), dst=dst, interpolation=cv2.INTER_CUBIC)
+
+def estimate_skew_deg(gray: np.ndarray) -> float:
+    """Canny+Hough로 수평선 기울기(도) 중앙값 추정"""
+    edges = cv2.Canny(gray, 50, 150, edges=_scratch("edges", gray.shape))
+    edges = cv2.dilate(edges, _DILATE_KERNEL, dst=_scratch("edges_d", gray.shape), iterations=1)
+
+    lines = cv2.HoughLinesP(
+        edges, 1, np.pi / 180, threshold=120,
+        minLineLength=max(30, int(0.15 * min(gray.shape))),
+        maxLineGap=10
+    )
+    if lines is None or len(lines) == 0:
+        return 0.0
+    seg = lines.reshape(-1, 4).astype(np.float64)
+    dx = seg[:, 2] - seg[:, 0]
+    dy = seg[:, 3] - seg[:, 1]
+    ok = dx != 0
+    ang = np.degrees(np.arctan2(dy[ok], dx[ok]))
+    ang = ang[(ang >= -25) & (ang <= 25)]
+    return float(np.median(ang)) if ang.size else 0.0
+
 # =========================================================
 # 이미지 전처리 (EasyOCR 친화: 데스큐 + 대비 강화 + 샤프닝)
 # =========================================================
@@ -16,26 +74,7 @@ def preprocess_for_easyocr(img_rgb: np.ndarray) -> np.ndarray:
     gray = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY)
 
     # 스큐 추정
-    edges = cv2.Canny(gray, 50, 150)
-    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8), iterations=1)
-
-    angle_deg = 0.0
-    lines = cv2.HoughLinesP(
-        edges, 1, np.pi / 180, threshold=120,
-        minLineLength=max(30, int(0.15 * min(gray.shape))),
-        maxLineGap=10
-    )
-    if lines is not None and len(lines) > 0:
-        angles = []
-        for x1, y1, x2, y2 in lines.reshape(-1, 4):
-            dx = x2 - x1
-            if dx == 0:
-                continue
-            ang = np.degrees(np.arctan2(y2 - y1, dx))
-            if -25 <= ang <= 25:
-                angles.append(ang)
-        if angles:
-            angle_deg = float(np.median(angles))
+    angle_deg = estimate_skew_deg(gray)
 
     if abs(angle_deg) > 0.2:
         h, w = gray.shape
@@ -48,8 +87,7 @@ def preprocess_for_easyocr(img_rgb: np.ndarray) -> np.ndarray:
     # 대비 강화 (LAB의 L 채널)
     lab = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2LAB)
     L, A, B = cv2.split(lab)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    L = clahe.apply(L)
+    L = _clahe().apply(L)
     lab = cv2.merge([L, A, B])
     img_rgb = cv2.cvtColor(lab, cv2.COLOR_LAB2RGB)
 
@@ -59,6 +97,36 @@ def preprocess_for_easyocr(img_rgb: np.ndarray) -> np.ndarray:
 
     return img_rgb
 
+def preprocess_for_easyocr_gray(img: np.ndarray) -> np.ndarray:
+    """
+    preprocess_for_easyocr의 휘도 1채널 버전 (EasyOCR은 어차피 내부에서 GRAY로 인식).
+    스큐 보정 → CLAHE → 약한 샤프닝을 1채널에서 수행하고,
+    중간 결과는 워커별 스크래치 버퍼에 덮어써 매 호출 할당을 없앤다.
+    입력: RGB 또는 GRAY ndarray / 출력: GRAY ndarray
+    ※ 반환 배열은 스크래치 버퍼이므로 같은 스레드의 다음 호출 전까지만 유효
+    """
+    if img.ndim == 3:
+        gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY, dst=_scratch("gray", img.shape[:2]))
+    else:
+        gray = img
+    shape = gray.shape
+
+    angle_deg = estimate_skew_deg(gray)
+    if abs(angle_deg) > 0.2:
+        h, w = shape
+        M = cv2.getRotationMatrix2D((w / 2, h / 2), angle_deg, 1.0)
+        gray = cv2.warpAffine(
+            gray, M, (w, h), dst=_scratch("rot", shape),
+            flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE
+        )
+
+    # 대비 강화 (휘도 채널 CLAHE)
+    eq = _clahe().apply(gray, dst=_scratch("eq", shape))
+
+    # 약한 샤프닝
+    blur = cv2.GaussianBlur(eq, (0, 0), sigmaX=1.0, dst=_scratch("blur", shape))
+    return cv2.addWeighted(eq, 1.25, blur, -0.25, 0, dst=_scratch("out", shape))
+
 # =========================================================
 # 텍스트 후처리 (중앙 유틸 파이프라인 사용)
 # =========================================================
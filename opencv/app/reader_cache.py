@@ -0,0 +1,154 @@
+import importlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# =========================================================
+# EasyOCR Reader 관리자
+#   - CRAFT 검출기(detector)는 언어셋과 무관하므로 1개만 로드해 공유
+#   - 언어셋별 인식기(recognizer)는 키 단위 락으로 1회만 생성 (동시 첫 요청 중복 생성 방지)
+#   - OCR_EASYOCR_MEM_CAP_MB 지정 시, 인식기 메모리 합계가 상한을 넘으면 유휴 인식기를 LRU로 제거
+#     (상한은 인식기만 계산 — 공유 검출기 ~80MB/장치는 별도, 항상 상주)
+# =========================================================
+# 기본은 상한 없음(0): 언어셋은 en / ko / ko,en 3종뿐이라 인식기 전부 상주해도 ~50MB 수준이고,
+# 제거 후 재로드(디스크에서 가중치 재적재)가 절약분보다 비싸다. 메모리가 빡빡한 배포에서만 opt-in.
+DEFAULT_MEM_CAP_MB = 0
+
+def _mem_cap_bytes() -> int:
+    """0 이하 = 상한 없음"""
+    v = os.environ.get("OCR_EASYOCR_MEM_CAP_MB", "").strip()
+    mb = float(v) if v else DEFAULT_MEM_CAP_MB
+    return int(mb * 1024 * 1024)
+
+def _obj_bytes(obj, seen, depth: int = 0) -> int:
+    """
+    state_dict 값의 텐서 바이트 수 (재귀).
+    CPU 동적 양자화(quantize_dynamic) 인식기의 packed LSTM/Linear 가중치는
+    parameters()/buffers()에 안 나오고 state_dict에 튜플 또는 ScriptObject로 들어 있으므로
+    __getstate__로 풀어서 센다.
+    """
+    if depth > 6 or obj is None or isinstance(obj, (str, bytes, int, float, bool)):
+        return 0
+    torch = sys.modules.get("torch")
+    if torch is not None and isinstance(obj, torch.Tensor):
+        key = (obj.data_ptr(), obj.numel())    # 공유 저장소 중복 계산 방지
+        if key in seen:
+            return 0
+        seen.add(key)
+        return obj.numel() * obj.element_size()
+    if isinstance(obj, dict):
+        return sum(_obj_bytes(v, seen, depth + 1) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_obj_bytes(v, seen, depth + 1) for v in obj)
+    getstate = getattr(obj, "__getstate__", None)
+    if getstate is None:
+        return 0
+    try:
+        return _obj_bytes(getstate(), seen, depth + 1)
+    except Exception:
+        return 0
+
+def _module_bytes(module) -> int:
+    """torch 모듈 state_dict(양자화 packed 가중치 포함)의 바이트 수 (메모리 상한 계산용)"""
+    if module is None:
+        return 0
+    return _obj_bytes(module.state_dict(), set())
+
+class _Entry:
+    __slots__ = ("reader", "nbytes", "in_use")
+
+    def __init__(self, reader, nbytes: int):
+        self.reader = reader
+        self.nbytes = nbytes
+        self.in_use = 0
+
+class EasyOCRReaderManager:
+    def __init__(self, mem_cap_bytes=None):
+        self.mem_cap_bytes = _mem_cap_bytes() if mem_cap_bytes is None else mem_cap_bytes
+        self._lock = threading.Lock()
+        self._detector_lock = threading.Lock()
+        self._build_locks = {}
+        self._entries = OrderedDict()   # key → _Entry (앞쪽일수록 오래 안 쓴 것)
+        self._detector_src = {}         # gpu 여부 → 검출기를 소유한 기준 Reader
+
+    # ---- 내부: 생성 ----
+    def _shared_detector(self, gpu: bool):
+        """검출기 전용 Reader (recognizer 없이) 1회 생성"""
+        with self._detector_lock:
+            src = self._detector_src.get(gpu)
+            if src is None:
+                easyocr = importlib.import_module("easyocr")
+                src = easyocr.Reader(["en"], gpu=gpu, detector=True, recognizer=False)
+                self._detector_src[gpu] = src
+            return src
+
+    def _build(self, langs, gpu: bool):
+        easyocr = importlib.import_module("easyocr")
+        src = self._shared_detector(gpu)
+        reader = easyocr.Reader(langs, gpu=gpu, detector=False, recognizer=True)
+        # readtext()의 검출 단계가 참조하는 속성을 공유 검출기로 연결
+        reader.detect_network = src.detect_network
+        reader.get_textbox = src.get_textbox
+        reader.get_detector = src.get_detector
+        reader.detector = src.detector
+        return reader
+
+    # ---- 내부: 제거 ----
+    def _evict_locked(self, keep_key: str):
+        if self.mem_cap_bytes <= 0:
+            return
+        total = sum(e.nbytes for e in self._entries.values())
+        for key in list(self._entries.keys()):
+            if total <= self.mem_cap_bytes:
+                break
+            ent = self._entries[key]
+            if key == keep_key or ent.in_use:
+                continue
+            del self._entries[key]
+            total -= ent.nbytes
+
+    # ---- 공개 API ----
+    @contextmanager
+    def acquire(self, langs, gpu: bool):
+        """
+        사용 중인 동안 LRU 제거 대상에서 제외되는 Reader 컨텍스트.
+        with manager.acquire(["ko", "en"], gpu) as reader: ...
+        """
+        key = ",".join(langs) + ("|gpu" if gpu else "|cpu")
+        with self._lock:
+            ent = self._entries.get(key)
+            if ent is not None:
+                ent.in_use += 1
+                self._entries.move_to_end(key)
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        if ent is None:
+            with build_lock:
+                with self._lock:
+                    ent = self._entries.get(key)
+                    if ent is not None:
+                        ent.in_use += 1
+                        self._entries.move_to_end(key)
+                if ent is None:
+                    reader = self._build(langs, gpu)
+                    ent = _Entry(reader, _module_bytes(getattr(reader, "recognizer", None)))
+                    ent.in_use = 1
+                    with self._lock:
+                        self._entries[key] = ent
+                        self._evict_locked(keep_key=key)
+        try:
+            yield ent.reader
+        finally:
+            with self._lock:
+                ent.in_use -= 1
+                self._evict_locked(keep_key=key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "cap_mb": round(self.mem_cap_bytes / 1024 / 1024, 1) if self.mem_cap_bytes > 0 else None,
+                "recognizers": {k: round(e.nbytes / 1024 / 1024, 1) for k, e in self._entries.items()},
+                "detectors": len(self._detector_src),
+            }
@@ -9,17 +9,28 @@ _TRANS_NUM = str.maketrans({
     "Z": "7", "S": "5", "B": "8",
 })
 
+# clean 단계에서 공백으로 치환되는 시각적 구분자
+_RE_SEPARATORS = re.compile(r"[|;+:{}!]")
+_RE_SPACES = re.compile(r"\s+")
+
 def token_has_digit(tok: str) -> bool:
     return bool(re.search(r"\d", tok))
 
+def _clean_line(line: str) -> str:
+    line = _RE_SEPARATORS.sub(" ", line)
+    return _RE_SPACES.sub(" ", line).strip()
+
+def is_blank_after_clean(line: str) -> bool:
+    """clean_text_generic에서 통째로 제거될 줄인지 (구분자/공백만)"""
+    return not _clean_line(line)
+
 def clean_text_generic(text: str) -> str:
     """
     OCR 텍스트에서 시각적 구분자 제거 및 공백 정리(안전 영역).
     """
     out_lines = []
     for line in text.splitlines():
-        line = re.sub(r"[|;+:{}!]", " ", line)
-        line = re.sub(r"\s+", " ", line).strip()
+        line = _clean_line(line)
         if line:
             out_lines.append(line)
     return "\n".join(out_lines)
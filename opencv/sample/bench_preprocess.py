@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from PIL import Image
+from ocr_utils import _prepare_img_for_easyocr
+
+# ---- 설정 ----
+IMAGE_PATH = os.environ.get("BENCH_IMAGE", os.path.join(os.path.dirname(__file__), "vitamin_kor_1.jpg"))
+REPEAT = int(os.environ.get("BENCH_REPEAT", "20"))
+MODES = ("rgb", "gray")
+
+def bench_mode(pil, mode: str) -> dict:
+    _prepare_img_for_easyocr(pil, mode)  # 워밍업 (CLAHE/스크래치 버퍼 생성)
+
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        _prepare_img_for_easyocr(pil, mode)
+    ms = (time.perf_counter() - t0) * 1000 / REPEAT
+
+    # 1회 호출당 할당량 (numpy/OpenCV 버퍼는 tracemalloc에 집계됨)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    _prepare_img_for_easyocr(pil, mode)
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms_per_call": round(ms, 2), "peak_alloc_mb": round((peak - before) / 1024 / 1024, 2)}
+
+IOU_MATCH = 0.5
+
+def _rect(bbox):
+    """EasyOCR 4점 bbox → (x0, y0, x1, y1)"""
+    xs = [p[0] for p in bbox]
+    ys = [p[1] for p in bbox]
+    return min(xs), min(ys), max(xs), max(ys)
+
+def _iou(a, b) -> float:
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+def _match_boxes(ref, other):
+    """
+    IoU 내림차순 탐욕 1:1 매칭 (IoU ≥ IOU_MATCH).
+    반환: [(ref_idx, other_idx, iou), ...]
+    """
+    pairs = []
+    for i, (bi, _ti, _ci) in enumerate(ref):
+        for j, (bj, _tj, _cj) in enumerate(other):
+            iou = _iou(_rect(bi), _rect(bj))
+            if iou >= IOU_MATCH:
+                pairs.append((iou, i, j))
+    pairs.sort(reverse=True)
+    used_i, used_j, out = set(), set(), []
+    for iou, i, j in pairs:
+        if i in used_i or j in used_j:
+            continue
+        used_i.add(i)
+        used_j.add(j)
+        out.append((i, j, iou))
+    return out
+
+def compare_ocr(pil, lang: str) -> dict:
+    """
+    두 모드의 EasyOCR 결과 비교 (easyocr 설치 환경에서만).
+      - 토큰 다중집합 겹침 (순서/박스 분할 차이에 둔감)
+      - 박스 IoU 매칭: 검출(CRAFT) 일치율, 매칭된 박스의 인식 텍스트 일치율
+    ※ gray 모드는 검출기 입력이 GRAY 복제 3채널, rgb 모드는 실제 컬러 → 검출 차이는 박스 지표에 드러남
+    """
+    from ocr_utils import _easyocr_read
+    res = {}
+    for mode in MODES:
+        img = _prepare_img_for_easyocr(pil, mode).copy()
+        res[mode] = _easyocr_read(img, lang, detail=1, paragraph=False)
+    ref, other = res["rgb"], res["gray"]
+
+    tok_ref = Counter(t for (_b, t, _c) in ref)
+    tok_other = Counter(t for (_b, t, _c) in other)
+    common = sum((tok_ref & tok_other).values())
+
+    matches = _match_boxes(ref, other)
+    text_same = sum(1 for i, j, _iou in matches if ref[i][1] == other[j][1])
+    return {
+        "boxes_rgb": len(ref),
+        "boxes_gray": len(other),
+        "token_multiset_overlap": round(common / max(1, max(len(ref), len(other))), 3),
+        "tokens_only_rgb": sum((tok_ref - tok_other).values()),
+        "tokens_only_gray": sum((tok_other - tok_ref).values()),
+        "boxes_matched_iou>=0.5": len(matches),
+        "mean_iou_matched": round(sum(m[2] for m in matches) / len(matches), 3) if matches else None,
+        "text_equal_in_matched": text_same,
+    }
+
+def main():
+    pil = Image.open(IMAGE_PATH).convert("RGB")
+    print(f"image={os.path.basename(IMAGE_PATH)} size={pil.size} repeat={REPEAT}")
+    for mode in MODES:
+        print(f"{mode:5s}", bench_mode(pil, mode))
+    if "--ocr" in sys.argv:
+        print("ocr", compare_ocr(pil, os.environ.get("OCR_LANG", "kor+eng")))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+# ---- 설정 ----
+APP_DIR = os.path.join(os.path.dirname(__file__), "..", "app")
+
+# 자식 프로세스에서 실행: main import(콜드스타트) 시간 + 유휴 RSS 측정
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import main
+from ocr_utils import preload_engines
+t_import = time.perf_counter() - t0
+t0 = time.perf_counter()
+loaded = preload_engines(sys.argv[1:])
+t_preload = time.perf_counter() - t0
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return None
+
+print(json.dumps({
+    "import_s": round(t_import, 3),
+    "preload_s": round(t_preload, 3),
+    "preloaded": loaded,
+    "rss_mb": rss_mb(),
+    "torch_loaded": "torch" in sys.modules,
+}))
+"""
+
+MODES = [
+    # (라벨, OCR_ENABLE_EASYOCR, 선로딩 엔진)
+    ("easyocr (lazy)", "1", []),
+    ("easyocr (preload)", "1", ["easyocr"]),
+    ("tesseract-only", "0", ["tesseract"]),
+]
+
+def run_mode(enable: str, preload):
+    env = dict(os.environ, OCR_ENABLE_EASYOCR=enable, OCR_PRELOAD="")
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, *preload],
+        cwd=APP_DIR, env=env, capture_output=True, text=True,
+    )
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1:]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    for label, enable, preload in MODES:
+        print(f"{label:20s}", json.dumps(run_mode(enable, preload), ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()